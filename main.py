@@ -18,14 +18,18 @@ Output:
 """
 
 import argparse
-from copy import deepcopy
+import os
+import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
 
 CSV_PATH = "data/national_parks_hiking_conditions.csv"
 OUTPUT_DIR = Path("output_maps")
+CSV_ENGINE = "pyarrow"
+# Bump whenever the cached frame's columns or dtypes change so stale caches are ignored
+CACHE_VERSION = 1
 
 MONTH_COLUMNS = [
     "Jan", "Feb", "Mar", "Apr", "May", "Jun",
@@ -33,17 +37,61 @@ MONTH_COLUMNS = [
 ]
 
 
-def load_data(csv_path: str = CSV_PATH) -> pd.DataFrame:
-    """Load the hiking conditions CSV and do basic validation."""
-    df = pd.read_csv(csv_path)
+def read_csv(csv_path: str, engine: str = CSV_ENGINE) -> pd.DataFrame:
+    """Read the CSV with the requested parser, falling back to the C engine if PyArrow is missing."""
+    dtype = {"Park": "string", "State": "string", "Latitude": "float32", "Longitude": "float32"}
+    dtype.update({month: "float32" for month in MONTH_COLUMNS})
+    if engine == "pyarrow":
+        try:
+            return pd.read_csv(csv_path, engine="pyarrow", dtype=dtype)
+        except ImportError:
+            pass
+    return pd.read_csv(csv_path, dtype=dtype)
+
+
+def write_cache(df: pd.DataFrame, cache_path: Path) -> None:
+    """Write the Parquet cache atomically so an interrupted run never leaves a partial file."""
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        df.to_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # The cache is only an optimization; never fail the run because it can't be written
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_data(csv_path: str = CSV_PATH, engine: str | None = None, use_cache: bool = True) -> pd.DataFrame:
+    """Load the hiking conditions CSV and do basic validation.
+
+    The parsed frame is cached as a Parquet file next to the CSV, keyed on
+    CACHE_VERSION, and reused while it is at least as new as the CSV. Passing
+    an explicit engine always re-parses the CSV (and refreshes the cache).
+    """
+    csv_file = Path(csv_path)
+    cache_path = csv_file.with_name(f"{csv_file.stem}.v{CACHE_VERSION}.parquet")
+    reuse_cache = use_cache and engine is None
+    if engine is None:
+        engine = CSV_ENGINE
+
+    if reuse_cache and cache_path.exists() and cache_path.stat().st_mtime >= csv_file.stat().st_mtime:
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception:
+            # Missing Parquet engine or an unreadable cache: re-parse and overwrite it below
+            pass
+
+    df = read_csv(csv_path, engine=engine)
 
     required_cols = {"Park", "State", "Latitude", "Longitude"} | set(MONTH_COLUMNS)
     missing = required_cols - set(df.columns)
     if missing:
         raise ValueError(f"CSV is missing required columns: {missing}")
 
-    df = df.copy()
-    df["AverageScore"] = df[MONTH_COLUMNS].mean(axis=1)
+    month_values = df.loc[:, MONTH_COLUMNS].to_numpy(dtype=np.float32)
+    df["AverageScore"] = month_values.mean(axis=1)
+
+    if use_cache:
+        write_cache(df, cache_path)
 
     return df
 
@@ -51,25 +99,31 @@ def load_data(csv_path: str = CSV_PATH) -> pd.DataFrame:
 def print_average_scores(df: pd.DataFrame) -> None:
     """Print all parks sorted by average score (descending)."""
     sorted_df = df.sort_values("AverageScore", ascending=False, ignore_index=True)
-    print("\nAverage hiking condition scores (high → low):")
-    for idx, row in sorted_df.iterrows():
-        rank = idx + 1
-        park = row["Park"]
-        state = row["State"]
-        avg = row["AverageScore"]
-        print(f"{rank:>2}. {park} ({state}) – {avg:.2f}")
+    parks = sorted_df["Park"].to_numpy()
+    states = sorted_df["State"].to_numpy()
+    avgs = sorted_df["AverageScore"].to_numpy()
+
+    lines = ["\nAverage hiking condition scores (high → low):"]
+    for rank, (park, state, avg) in enumerate(zip(parks, states, avgs), start=1):
+        lines.append(f"{rank:>2}. {park} ({state}) – {avg:.2f}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def make_interactive_dashboard(df: pd.DataFrame, output_dir: Path = OUTPUT_DIR):
     """Create a single HTML file with buttons to toggle between months and rating filter."""
+    # Imported here so the CLI (e.g. --help) doesn't pay Plotly's import time
+    import plotly.graph_objects as go
+
     output_dir.mkdir(parents=True, exist_ok=True)
     output_path = output_dir / "hiking_conditions_interactive.html"
 
-    overall_min = min(df[MONTH_COLUMNS].min().min(), df["AverageScore"].min())
-    overall_max = max(df[MONTH_COLUMNS].max().max(), df["AverageScore"].max())
-    
+    # AverageScore is a row mean of the month columns, so it never extends their range
+    month_values = df[MONTH_COLUMNS].to_numpy()
+    overall_min = month_values.min()
+    overall_max = month_values.max()
+
     # Create rating filter steps (0-10 in 0.5 increments)
-    rating_steps = [i * 0.5 for i in range(21)]
+    rating_steps = np.arange(21) * 0.5
     dropdown_labels = MONTH_COLUMNS + ["Average"]
     value_series_map = {}
     for label in dropdown_labels:
@@ -78,14 +132,25 @@ def make_interactive_dashboard(df: pd.DataFrame, output_dir: Path = OUTPUT_DIR):
         else:
             value_series_map[label] = df[label]
 
+    park_arr = df["Park"].to_numpy()
+    state_arr = df["State"].to_numpy()
+
     top_lists = {}
     for label, series in value_series_map.items():
-        top_entries = series.sort_values(ascending=False).head(15)
+        values = series.to_numpy()
+        # Find the 15th-highest score in O(N), keep everything above it and fill the remaining
+        # slots with tied parks in row order, then sort only those; ties always break by CSV row
+        if len(values) > 15:
+            cutoff = np.partition(values, len(values) - 15)[len(values) - 15]
+            above = np.flatnonzero(values > cutoff)
+            tied = np.flatnonzero(values == cutoff)[:15 - len(above)]
+            top_pos = np.sort(np.concatenate([above, tied]))
+        else:
+            top_pos = np.arange(len(values))
+        top_pos = top_pos[np.argsort(-values[top_pos], kind="stable")]
         lines = [f"<b>Top 15 – {label}</b>"]
-        for idx, (park_idx, score) in enumerate(top_entries.items(), start=1):
-            park = df.at[park_idx, "Park"]
-            state = df.at[park_idx, "State"]
-            lines.append(f"{idx}. {park} ({state}) – {score:.1f}")
+        for idx, pos in enumerate(top_pos, start=1):
+            lines.append(f"{idx}. {park_arr[pos]} ({state_arr[pos]}) – {values[pos]:.1f}")
         top_lists[label] = "<br>".join(lines)
 
     def make_top_annotation(text: str) -> dict:
@@ -103,101 +168,110 @@ def make_interactive_dashboard(df: pd.DataFrame, output_dir: Path = OUTPUT_DIR):
             "font": {"size": 12},
         }
 
-    # Create traces for each month/average and each rating threshold
-    traces = []
-    trace_map = {}  # (month_idx, rating_threshold) -> trace_idx
-    
-    for month_idx, label in enumerate(dropdown_labels):
-        value_series = value_series_map[label]
-        hover_label = label
-
-        for rating_threshold in rating_steps:
-            # Filter points based on rating threshold
-            mask = value_series >= rating_threshold
-            
-            filtered_df = df[mask]
-            filtered_values = value_series[mask]
-            
-            customdata = filtered_df[["State"]].assign(
-                SelectedValue=filtered_values,
-                AverageScore=filtered_df["AverageScore"],
-            ).to_numpy()
-
-            trace_idx = len(traces)
-            trace_map[(month_idx, rating_threshold)] = trace_idx
-            
-            traces.append(
-                go.Scattergeo(
-                    lat=filtered_df["Latitude"],
-                    lon=filtered_df["Longitude"],
-                    mode="markers",
-                    text=filtered_df["Park"],
-                    marker=dict(
-                        size=8,
-                        color=filtered_values,
-                        coloraxis="coloraxis",
-                    ),
-                    customdata=customdata,
-                    hovertemplate=(
-                        "<b>%{text}</b><br>State: %{customdata[0]}<br>"
-                        f"Condition ({hover_label}): %{{customdata[1]:.1f}}<br>"
-                        "Average: %{customdata[2]:.1f}<extra></extra>"
-                    ),
-                    visible=(month_idx == 0 and rating_threshold == 0),
-                    name=label,
-                )
-            )
+    # Precompute which parks pass each rating threshold in one broadcasted comparison:
+    # masks[park, month_idx, step_idx] over an (N, len(dropdown_labels)) value matrix
+    value_matrix = np.column_stack([value_series_map[label].to_numpy() for label in dropdown_labels])
+    masks = value_matrix[:, :, None] >= rating_steps[None, None, :]
+
+    # plotly.js neither draws nor hovers points with a missing longitude, so filtered-out
+    # parks get a null lon. The trace, slider steps and month buttons all use this one array.
+    lon_values = df["Longitude"].to_numpy(dtype=np.float64)
+    masked_lon = np.where(masks, lon_values.astype(object)[:, None, None], None)
+
+    def make_slider_steps(month_idx: int) -> list:
+        # Hide filtered-out parks by restyling only the longitude of the single map trace
+        return [
+            {
+                "label": f"{threshold:.1f}",
+                "method": "restyle",
+                "args": [
+                    {"lon": [masked_lon[:, month_idx, step_idx].tolist()]},
+                    [0],
+                ],
+            }
+            for step_idx, threshold in enumerate(rating_steps)
+        ]
+
+    # Each month's steps are shared by its dropdown button and, for month 0, the initial slider
+    slider_steps = [make_slider_steps(month_idx) for month_idx in range(len(dropdown_labels))]
+
+    # State and average columns are shared by every month; only the selected value differs
+    customdata_base = np.empty((len(df), 3), dtype=object)
+    customdata_base[:, 0] = state_arr
+    customdata_base[:, 2] = df["AverageScore"].to_numpy()
 
-    select_annotation = dict(
-        text="Select month",
-        showarrow=False,
-        x=0.005,
-        xanchor="left",
-        y=1.04,
-        yanchor="top",
-        font=dict(size=12),
+    # Per-month data restyled onto the single trace when a dropdown button is clicked
+    month_styles = []
+    for label in dropdown_labels:
+        customdata = customdata_base.copy()
+        customdata[:, 1] = value_series_map[label].to_numpy()
+        month_styles.append({
+            "marker.color": [value_series_map[label].to_numpy().tolist()],
+            "customdata": [customdata.tolist()],
+            "hovertemplate": [
+                "<b>%{text}</b><br>State: %{customdata[0]}<br>"
+                f"Condition ({label}): %{{customdata[1]:.1f}}<br>"
+                "Average: %{customdata[2]:.1f}<extra></extra>"
+            ],
+            "name": [label],
+        })
+
+    # Coordinates and park names are embedded once; months only swap color and hover data
+    first_style = month_styles[0]
+    trace = go.Scattergeo(
+        lat=df["Latitude"],
+        lon=lon_values,
+        mode="markers",
+        text=df["Park"],
+        marker=dict(
+            size=8,
+            color=first_style["marker.color"][0],
+            coloraxis="coloraxis",
+        ),
+        customdata=first_style["customdata"][0],
+        hovertemplate=first_style["hovertemplate"][0],
+        name=first_style["name"][0],
     )
+
+    def make_select_annotation() -> dict:
+        return {
+            "text": "Select month",
+            "showarrow": False,
+            "x": 0.005,
+            "xanchor": "left",
+            "y": 1.04,
+            "yanchor": "top",
+            "font": {"size": 12},
+        }
     
     buttons = []
     
     for month_idx, label in enumerate(dropdown_labels):
         # When a month button is clicked, show that month with rating 0 (all parks)
-        visibility = [False] * len(traces)
-        visibility[trace_map[(month_idx, 0)]] = True
-        
         buttons.append(
             dict(
                 label=label,
                 method="update",
                 args=[
-                    {"visible": visibility},
+                    {**month_styles[month_idx], "lon": [lon_values.tolist()]},
                     {
                         "title": f"US National Parks Hiking Conditions – {label}",
                         "annotations": [
-                            deepcopy(select_annotation),
+                            make_select_annotation(),
                             make_top_annotation(top_lists[label]),
                         ],
                         "sliders": [{
                             "active": 0,
                             "currentvalue": {"prefix": "Min rating: ", "visible": True},
-                            "steps": [
-                                {
-                                    "label": f"{threshold:.1f}",
-                                    "method": "update",
-                                    "args": [
-                                        {"visible": [i == trace_map[(month_idx, threshold)] for i in range(len(traces))]},
-                                        {}
-                                    ]
-                                }
-                                for threshold in rating_steps
-                            ]
+                            "steps": slider_steps[month_idx],
                         }]
                     },
+                    [0],
                 ],
             )
         )
 
-    fig = go.Figure(data=traces)
+    fig = go.Figure(data=[trace])
     fig.update_layout(
         title=f"US National Parks Hiking Conditions – {dropdown_labels[0]}",
         legend_title_text="Dataset",
@@ -217,21 +291,11 @@ def make_interactive_dashboard(df: pd.DataFrame, output_dir: Path = OUTPUT_DIR):
                 active=0,
                 currentvalue={"prefix": "Min rating: ", "visible": True},
                 pad={"t": 50},
-                steps=[
-                    dict(
-                        label=f"{threshold:.1f}",
-                        method="update",
-                        args=[
-                            {"visible": [i == trace_map[(0, threshold)] for i in range(len(traces))]},
-                            {}
-                        ]
-                    )
-                    for threshold in rating_steps
-                ]
+                steps=slider_steps[0],
             )
         ],
         annotations=[
-            deepcopy(select_annotation),
+            make_select_annotation(),
             make_top_annotation(top_lists[dropdown_labels[0]]),
         ],
         margin=dict(l=20, r=20, t=60, b=60),
@@ -268,6 +332,20 @@ def parse_args():
         default=CSV_PATH,
         help=f"Path to CSV file (default: {CSV_PATH})",
     )
+    parser.add_argument(
+        "--engine",
+        choices=["pyarrow", "c"],
+        default=None,
+        help=(
+            f"CSV parser engine; pyarrow falls back to c if not installed (default: {CSV_ENGINE}). "
+            "Passing this always re-parses the CSV instead of reusing the Parquet cache"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the CSV instead of reusing its Parquet cache",
+    )
     parser.add_argument(
         "--outdir",
         type=str,
@@ -280,7 +358,7 @@ def parse_args():
 
 def main():
     args = parse_args()
-    df = load_data(args.csv)
+    df = load_data(args.csv, engine=args.engine, use_cache=not args.no_cache)
     outdir = Path(args.outdir)
 
     print_average_scores(df)